@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-import importlib
+import atexit
+import functools
 import os
 import sys
 from dataclasses import dataclass
@@ -17,17 +18,26 @@ DEFAULT_CHAT_FILE = "chat.txt"
 DEFAULT_MAX_ITERATIONS = 10
 
 
+_rlm_path_added = False
+
+
+@functools.cache
 def project_root() -> Path:
     # server.py is inside DeepRecurse/claude_skill_mcp
     return Path(__file__).resolve().parents[1]
 
 
 def ensure_rlm_importable() -> None:
+    global _rlm_path_added
+    if _rlm_path_added:
+        return
     rlm_path = str(project_root() / "rlm-minimal")
     if rlm_path not in sys.path:
         sys.path.insert(0, rlm_path)
+    _rlm_path_added = True
 
 
+@functools.lru_cache(maxsize=32)
 def resolve_chat_path(chat_file: str) -> Path:
     path = Path(chat_file)
     if not path.is_absolute():
@@ -45,19 +55,66 @@ class RLMConfig:
 class ChatStore:
     def __init__(self, chat_path: Path):
         self.chat_path = chat_path
-        self._ensure_file()
+        # Kept open for the life of the process; closed via atexit.
+        self._open()
+        atexit.register(self.close)
+        self._cached_key: tuple[int, int] | None = None
+        self._cached_text = ""
 
     def _ensure_file(self) -> None:
         self.chat_path.parent.mkdir(parents=True, exist_ok=True)
         self.chat_path.touch(exist_ok=True)
 
+    def _open(self) -> None:
+        self._ensure_file()
+        self._fh = self.chat_path.open("a", encoding="utf-8", buffering=8192)
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def _reopen(self) -> None:
+        # Chat file was removed; recreate it instead of writing to the unlinked one.
+        self._fh.close()
+        self._open()
+        self._cached_key = None
+        self._cached_text = ""
+
+    def _stat_key(self) -> tuple[int, int]:
+        st = self.chat_path.stat()
+        return st.st_mtime_ns, st.st_size
+
     def read_context(self) -> str:
-        context = self.chat_path.read_text(encoding="utf-8")
+        # Only reread when the file changed behind our back (another writer).
+        try:
+            key = self._stat_key()
+        except FileNotFoundError:
+            self._reopen()
+            return "No prior chat history yet."
+        if key != self._cached_key:
+            self._cached_text = self.chat_path.read_text(encoding="utf-8")
+            self._cached_key = key
+        context = self._cached_text
         return context if context.strip() else "No prior chat history yet."
 
     def append_turn(self, query: str, answer: str) -> None:
-        with self.chat_path.open("a", encoding="utf-8") as file:
-            file.write(f"\nUSER: {query}\nASSISTANT: {answer}\n")
+        turn = f"\nUSER: {query}\nASSISTANT: {answer}\n"
+        try:
+            fresh = self._cached_key == self._stat_key()
+        except FileNotFoundError:
+            self._reopen()
+            fresh = False
+        self._fh.write(turn)
+        # Flush so other readers of the chat file see the turn.
+        self._fh.flush()
+        if fresh:
+            self._cached_text += turn
+            self._cached_key = self._stat_key()
+
+
+# Unbounded: each store owns an open handle, so evicting one would leak it.
+@functools.cache
+def get_chat_store(chat_path: Path) -> ChatStore:
+    return ChatStore(chat_path)
 
 
 class RLMService:
@@ -68,9 +125,9 @@ class RLMService:
     def _get_rlm(self):
         if self._rlm is None:
             ensure_rlm_importable()
-            rlm_repl_module = importlib.import_module("rlm.rlm_repl")
-            rlm_cls = rlm_repl_module.RLM_REPL
-            self._rlm = rlm_cls(
+            from rlm.rlm_repl import RLM_REPL
+
+            self._rlm = RLM_REPL(
                 api_key=os.getenv("OPENAI_API_KEY"),
                 model=self.config.model,
                 recursive_model=self.config.recursive_model,
@@ -101,7 +158,7 @@ def chat_rlm_query(query: str, chat_file: str = DEFAULT_CHAT_FILE) -> str:
     if not clean_query:
         return "Error: query cannot be empty."
 
-    store = ChatStore(resolve_chat_path(chat_file))
+    store = get_chat_store(resolve_chat_path(chat_file))
     context = store.read_context()
 
     try:
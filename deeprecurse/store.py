@@ -9,6 +9,12 @@ Usage:
 
 Volume layout:
     /rlm-data/{codebase}/context.txt   <- single file, appended to over time
+    /rlm-data/{codebase}/.staging/     <- uploads waiting to be appended
+
+The input is uploaded to .staging/ first and then appended to context.txt by a
+single remote call with a single commit, so context.txt either gets the whole
+transcript or none of it. A run that fails before that call can leave a stray
+file in .staging/, but never a partial block in context.txt.
 """
 
 from __future__ import annotations
@@ -17,7 +23,34 @@ import argparse
 import os
 import sys
 import tempfile
+import uuid
 from pathlib import Path
+from typing import BinaryIO
+
+
+CHUNK_BYTES = 1024 * 1024
+
+
+def copy_chunks(source: BinaryIO, dest: BinaryIO) -> bool:
+    """Copy source into dest in fixed-size chunks; return whether any non-whitespace was seen."""
+    has_content = False
+    chunk = source.read(CHUNK_BYTES)
+    while chunk:
+        if not has_content and chunk.strip():
+            has_content = True
+        dest.write(chunk)
+        chunk = source.read(CHUNK_BYTES)
+    return has_content
+
+
+def has_content(source: BinaryIO) -> bool:
+    """Scan source in fixed-size chunks, stopping at the first non-whitespace byte."""
+    chunk = source.read(CHUNK_BYTES)
+    while chunk:
+        if chunk.strip():
+            return True
+        chunk = source.read(CHUNK_BYTES)
+    return False
 
 
 def main() -> None:
@@ -35,47 +68,48 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    if args.file == "-":
-        text = sys.stdin.read()
-    else:
-        with open(args.file) as f:
-            text = f.read()
-
-    if not text.strip():
-        print("No content to store.", file=sys.stderr)
-        sys.exit(1)
-
-    # Add mcp-modal/ to path so we can import modal_runtime
-    mcp_modal_path = str(Path(__file__).resolve().parent.parent / "mcp-modal")
-    if mcp_modal_path not in sys.path:
-        sys.path.insert(0, mcp_modal_path)
-
-    from modal_runtime import shared_volume
-
-    context_relpath = f"{args.codebase}/context.txt"
-
-    # Read existing content (if any), append new text, re-upload
-    existing = b""
+    # Stdin is spooled to a temp file so it can be uploaded without holding it in memory
+    tmp_path = None
     try:
-        for chunk in shared_volume.read_file(context_relpath):
-            existing += chunk
-    except Exception:
-        pass  # file doesn't exist yet
-
-    new_content = existing.decode("utf-8", errors="replace") + text
-    if not new_content.endswith("\n"):
-        new_content += "\n"
-
-    with shared_volume.batch_upload(force=True) as batch:
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as tmp:
-            tmp.write(new_content)
-            tmp_path = tmp.name
-        batch.put_file(tmp_path, context_relpath)
-
-    os.unlink(tmp_path)
-
-    print(f"Appended {len(text)} chars to {context_relpath} (total: {len(new_content)} chars)")
-
+        if args.file == "-":
+            with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as tmp:
+                tmp_path = tmp.name
+                content = copy_chunks(sys.stdin.buffer, tmp)
+            local_path = tmp_path
+        else:
+            with open(args.file, "rb") as f:
+                content = has_content(f)
+            local_path = args.file
+
+        if not content:
+            print("No content to store.", file=sys.stderr)
+            sys.exit(1)
+
+        # Add mcp-modal/ to path so we can import modal_runtime
+        mcp_modal_path = str(Path(__file__).resolve().parent.parent / "mcp-modal")
+        if mcp_modal_path not in sys.path:
+            sys.path.insert(0, mcp_modal_path)
+
+        from modal_runtime import app, append_staged_remote, shared_volume
+
+        context_relpath = f"{args.codebase}/context.txt"
+        staged_relpath = f"{args.codebase}/.staging/{uuid.uuid4().hex}.txt"
+
+        # Streamed from disk by the client; nothing touches context.txt yet
+        with shared_volume.batch_upload() as batch:
+            batch.put_file(local_path, staged_relpath)
+
+        with app.run():
+            total = append_staged_remote.remote(
+                context_relpath=context_relpath,
+                staged_relpath=staged_relpath,
+            )
+        appended = os.path.getsize(local_path)
+    finally:
+        if tmp_path is not None:
+            os.unlink(tmp_path)
+
+    print(f"Appended {appended} bytes to {context_relpath} (total: {total} bytes)")
 
 if __name__ == "__main__":
     main()
@@ -10,7 +10,9 @@ Deploy:
 
 from __future__ import annotations
 
+import functools
 import os
+import shutil
 import sys
 from pathlib import Path
 
@@ -42,6 +44,24 @@ shared_volume = modal.Volume.from_name(MODAL_VOLUME_NAME, create_if_missing=True
 # Helpers
 # ---------------------------------------------------------------------------
 
+# Volume directories already created by this container
+_known_dirs: set[str] = set()
+# Context files already known to exist (files are only ever appended to)
+_known_files: set[str] = set()
+
+
+# Only the RLM functions need RLM_REPL; importing it at module scope would make
+# every cold upload container load openai, rich and the RLM package too
+@functools.cache
+def _rlm_repl_cls():
+    """Import RLM_REPL on first use, once per container."""
+    if SOURCE_PATH_IN_IMAGE not in sys.path:
+        sys.path.insert(0, SOURCE_PATH_IN_IMAGE)
+    from rlm.rlm_repl import RLM_REPL
+
+    return RLM_REPL
+
+
 def _load_env() -> None:
     env_path = os.path.join(MOUNT_PATH, ENV_RELATIVE_PATH)
     if os.path.exists(env_path):
@@ -57,34 +77,79 @@ def _read_volume_file(relpath: str) -> str:
         return f.read()
 
 
-def _append_to_volume(relpath: str, text: str) -> None:
-    """Append text to a file on the volume (creating dirs as needed)."""
+def _append_to_volume(relpath: str, *parts: str) -> None:
+    """Append text parts to a file on the volume as one write (creating dirs as needed)."""
+    full = os.path.join(MOUNT_PATH, relpath)
+    parent = os.path.dirname(full)
+    if parent not in _known_dirs:
+        os.makedirs(parent, exist_ok=True)
+        _known_dirs.add(parent)
+
+    # Append on top of the latest committed state, not this container's last view
+    shared_volume.reload()
+
+    # Raw O_APPEND writev of pre-encoded parts; skips the TextIOWrapper layer
+    # and never concatenates the (possibly large) transcript with its framing
+    bufs = [part.encode("utf-8") for part in parts]
+    fd = os.open(full, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        written = os.writev(fd, bufs)
+        if written < sum(map(len, bufs)):
+            data = memoryview(b"".join(bufs))[written:]
+            while data:
+                data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+    _known_files.add(full)
+    shared_volume.commit()
+
+
+def _append_staged_to_volume(relpath: str, staged_relpath: str) -> None:
+    """Move a staged upload onto the end of a volume file in one commit, newline-terminated."""
     full = os.path.join(MOUNT_PATH, relpath)
-    os.makedirs(os.path.dirname(full), exist_ok=True)
-    with open(full, "a", encoding="utf-8") as f:
-        f.write(text)
+    staged = os.path.join(MOUNT_PATH, staged_relpath)
+    parent = os.path.dirname(full)
+    if parent not in _known_dirs:
+        os.makedirs(parent, exist_ok=True)
+        _known_dirs.add(parent)
+
+    # The staged file was uploaded after this container mounted the volume
+    shared_volume.reload()
+
+    with open(staged, "rb") as src, open(full, "ab") as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+        if src.tell():
+            src.seek(-1, os.SEEK_END)
+            if src.read(1) != b"\n":
+                dst.write(b"\n")
+    os.remove(staged)
+    _known_files.add(full)
     shared_volume.commit()
 
 
 def _ensure_context_file(relpath: str) -> str:
     """Ensure context file exists on the volume, return its absolute path."""
     full = os.path.join(MOUNT_PATH, relpath)
-    os.makedirs(os.path.dirname(full), exist_ok=True)
+    if full in _known_files:
+        return full
+    parent = os.path.dirname(full)
+    if parent not in _known_dirs:
+        os.makedirs(parent, exist_ok=True)
+        _known_dirs.add(parent)
     if not os.path.exists(full):
         with open(full, "w", encoding="utf-8") as f:
             f.write("")
         shared_volume.commit()
+    _known_files.add(full)
     return full
 
 
 def _run_rlm(query: str, context_relpath: str) -> str:
     """Run RLM_REPL with context from the volume."""
-    sys.path.insert(0, SOURCE_PATH_IN_IMAGE)
-    from rlm.rlm_repl import RLM_REPL
-
     _load_env()
     context_path = _ensure_context_file(context_relpath)
 
+    RLM_REPL = _rlm_repl_cls()
     rlm = RLM_REPL(
         model="gpt-5",
         recursive_model="gpt-5-nano",
@@ -103,6 +168,7 @@ def _run_rlm(query: str, context_relpath: str) -> str:
     image=image,
     volumes={MOUNT_PATH: shared_volume},
     timeout=3600,
+    enable_memory_snapshot=True,
 )
 def run_rlm_remote(
     query: str,
@@ -112,12 +178,10 @@ def run_rlm_remote(
     max_iterations: int = 10,
 ) -> str:
     """Run RLM_REPL on Modal with context read from a mounted volume file."""
-    sys.path.insert(0, SOURCE_PATH_IN_IMAGE)
-    from rlm.rlm_repl import RLM_REPL
-
     _load_env()
     context_path = _ensure_context_file(context_relpath)
 
+    RLM_REPL = _rlm_repl_cls()
     rlm = RLM_REPL(
         model=model,
         recursive_model=recursive_model,
@@ -136,10 +200,20 @@ def store_context(thread_id: str, session_id: str, transcript: str) -> dict:
     """Append transcript text to a thread's context file on the volume."""
     relpath = f"{thread_id}/context.txt"
     header = f"\n[SESSION {session_id}]\n"
-    _append_to_volume(relpath, header + transcript + "\n")
+    _append_to_volume(relpath, header, transcript, "\n")
     return {"status": "ok", "thread_id": thread_id, "session_id": session_id}
 
 
+@app.function(
+    image=image,
+    volumes={MOUNT_PATH: shared_volume},
+)
+def append_staged_remote(context_relpath: str, staged_relpath: str) -> int:
+    """Append a file staged on the volume to a context file, returning its new size in bytes."""
+    _append_staged_to_volume(context_relpath, staged_relpath)
+    return os.path.getsize(os.path.join(MOUNT_PATH, context_relpath))
+
+
 # ---------------------------------------------------------------------------
 # Web endpoints (called by Cloudflare Worker via HTTP)
 # ---------------------------------------------------------------------------
@@ -148,6 +222,7 @@ def store_context(thread_id: str, session_id: str, transcript: str) -> dict:
     image=image,
     volumes={MOUNT_PATH: shared_volume},
     timeout=3600,
+    enable_memory_snapshot=True,
 )
 @modal.fastapi_endpoint(method="POST")
 def query_endpoint(item: dict) -> dict:
@@ -158,7 +233,7 @@ def query_endpoint(item: dict) -> dict:
 
     answer = _run_rlm(query, context_relpath)
 
-    _append_to_volume(context_relpath, f"\nUSER: {query}\nASSISTANT: {answer}\n")
+    _append_to_volume(context_relpath, f"\nUSER: {query}\nASSISTANT: ", answer, "\n")
 
     return {"answer": answer}
 
@@ -175,6 +250,6 @@ def upload_endpoint(item: dict) -> dict:
     session_id = item["session_id"]
 
     relpath = f"{thread_id}/context.txt"
-    _append_to_volume(relpath, f"\n[SESSION {session_id}]\n{transcript}\n")
+    _append_to_volume(relpath, f"\n[SESSION {session_id}]\n", transcript, "\n")
 
     return {"status": "ok", "thread_id": thread_id, "session_id": session_id}
@@ -1,5 +1,6 @@
 import sys
 import io
+import queue
 import threading
 import json
 import tempfile
@@ -52,8 +53,52 @@ class Sub_RLM(RLM):
         raise NotImplementedError("Reset is not implemented for the Sub-RLM.")
 
 
+class _SandboxWorker:
+    """One Modal Sandbox running rlm.sub_rlm_worker; serves one request at a time."""
+
+    def __init__(self, create_kwargs: dict):
+        import modal
+
+        self.sandbox = modal.Sandbox.create(**create_kwargs)
+        self.process = self.sandbox.exec("python", "-m", "rlm.sub_rlm_worker", bufsize=1)
+        # Replies are read on a thread so request() can wait on them with a deadline
+        self.replies = queue.Queue()
+        threading.Thread(target=self._pump_replies, daemon=True).start()
+
+    def _pump_replies(self) -> None:
+        """Forward worker stdout lines into the queue; None marks the worker exiting."""
+        try:
+            for line in self.process.stdout:
+                self.replies.put(line)
+        except Exception:
+            pass
+        finally:
+            self.replies.put(None)
+
+    def request(self, frame: str, deadline: float) -> dict:
+        """Send one frame to the worker and wait (bounded) for its reply."""
+        self.process.stdin.write(frame.encode("utf-8"))
+        self.process.stdin.drain()
+        try:
+            line = self.replies.get(timeout=deadline)
+        except queue.Empty:
+            raise TimeoutError(f"no reply from sandbox worker within {deadline}s") from None
+        if line is None:
+            stderr = self.process.stderr.read()
+            if isinstance(stderr, bytes):
+                stderr = stderr.decode("utf-8", errors="replace")
+            raise RuntimeError(stderr.strip() if stderr and stderr.strip() else "sandbox worker exited")
+        return json.loads(line)
+
+    def close(self) -> None:
+        try:
+            self.sandbox.terminate()
+        except Exception:
+            pass
+
+
 class ModalSandboxSubRLM(RLM):
-    """Sub-RLM client that runs each completion in a Modal Sandbox."""
+    """Sub-RLM client that runs completions on a small pool of long-lived Modal Sandbox workers."""
 
     def __init__(
         self,
@@ -64,6 +109,8 @@ class ModalSandboxSubRLM(RLM):
         sandbox_workdir: Optional[str] = None,
         env_file_path: Optional[str] = None,
         timeout: int = 300,
+        sandbox_lifetime: int = 3600,
+        max_workers: int = 8,
     ):
         self.model = model
         self.sandbox_app = sandbox_app
@@ -72,66 +119,89 @@ class ModalSandboxSubRLM(RLM):
         self.sandbox_workdir = sandbox_workdir
         self.env_file_path = env_file_path
         self.timeout = timeout
+        self.sandbox_lifetime = sandbox_lifetime
+
+        # Each worker serves one request at a time; concurrent llm_query calls (REPL code
+        # using threads) each check one out, so up to max_workers of them run in parallel
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._pool_lock = threading.Lock()
+        self._idle: list[_SandboxWorker] = []
+        self._workers: set[_SandboxWorker] = set()
+        # The worker's client makes a single attempt bounded by self.timeout, so this
+        # deadline is the only retry/timeout policy on the request
+        self._reply_deadline = timeout + 30
 
         if not self.sandbox_volumes:
             raise ValueError("sandbox_volumes is required for ModalSandboxSubRLM")
 
-    def completion(self, prompt) -> str:
-        try:
-            import modal
-        except Exception as exc:
-            return f"Error making LLM query in sandbox: failed to import modal ({exc})"
-
-        sandbox = None
-        try:
-            create_kwargs = {
-                "app": self.sandbox_app,
-                "volumes": self.sandbox_volumes,
-                "workdir": self.sandbox_workdir,
-                "timeout": self.timeout + 30,
-            }
-            if self.sandbox_image is not None:
-                create_kwargs["image"] = self.sandbox_image
-
-            sandbox = modal.Sandbox.create(**create_kwargs)
-            process = sandbox.exec(
-                "python",
-                "-m",
-                "rlm.sub_rlm_worker",
-                timeout=self.timeout,
-            )
+    def _start_worker(self) -> _SandboxWorker:
+        create_kwargs = {
+            "app": self.sandbox_app,
+            "volumes": self.sandbox_volumes,
+            "workdir": self.sandbox_workdir,
+            "timeout": self.sandbox_lifetime,
+        }
+        if self.sandbox_image is not None:
+            create_kwargs["image"] = self.sandbox_image
 
-            payload = {
-                "prompt": prompt,
-                "model": self.model,
-                "env_file_path": self.env_file_path,
-            }
-            process.stdin.write(json.dumps(payload).encode("utf-8"))
-            process.stdin.write_eof()
-            process.stdin.drain()
+        worker = _SandboxWorker(create_kwargs)
+        with self._pool_lock:
+            self._workers.add(worker)
+        return worker
 
-            stdout = process.stdout.read()
-            stderr = process.stderr.read()
-            process.wait()
+    def _discard_worker(self, worker: _SandboxWorker) -> None:
+        with self._pool_lock:
+            self._workers.discard(worker)
+        worker.close()
 
-            if isinstance(stdout, bytes):
-                stdout = stdout.decode("utf-8", errors="replace")
-            if isinstance(stderr, bytes):
-                stderr = stderr.decode("utf-8", errors="replace")
+    def close(self) -> None:
+        """Terminate every worker sandbox; later completions start fresh ones."""
+        with self._pool_lock:
+            workers, self._workers, self._idle = self._workers, set(), []
+        for worker in workers:
+            worker.close()
 
-            if process.returncode != 0:
-                error_msg = stderr.strip() if stderr and stderr.strip() else "sandbox subprocess failed"
-                return f"Error making LLM query in sandbox: {error_msg}"
+    def completion(self, prompt) -> str:
+        payload = {
+            "prompt": prompt,
+            "model": self.model,
+            "env_file_path": self.env_file_path,
+            "timeout": self.timeout,
+        }
+        # Newline-delimited JSON frames; json.dumps escapes any newlines in the prompt
+        frame = json.dumps(payload, separators=(",", ":")) + "\n"
 
-            return stdout or ""
-        except Exception as exc:
-            return f"Error making LLM query in sandbox: {exc}"
-        finally:
-            if sandbox is not None:
+        with self._slots:
+            with self._pool_lock:
+                worker = self._idle.pop() if self._idle else None
+            # A worker that was already running may have died since (e.g. the sandbox
+            # hit its lifetime), so retry once on a fresh one before reporting an error
+            while True:
+                fresh = worker is None
                 try:
-                    sandbox.terminate()
-                except Exception:
-                    pass
+                    if fresh:
+                        worker = self._start_worker()
+                    reply = worker.request(frame, self._reply_deadline)
+                    break
+                except TimeoutError as exc:
+                    # Still busy on this request; don't wait out another deadline
+                    self._discard_worker(worker)
+                    return f"Error making LLM query in sandbox: {exc}"
+                except Exception as exc:
+                    if worker is not None:
+                        self._discard_worker(worker)
+                        worker = None
+                    if fresh:
+                        return f"Error making LLM query in sandbox: {exc}"
+
+            with self._pool_lock:
+                # close() may have run meanwhile; only pool workers it didn't terminate
+                if worker in self._workers:
+                    self._idle.append(worker)
+
+        if "error" in reply:
+            return f"Error making LLM query in sandbox: {reply['error']}"
+        return reply.get("response") or ""
 
     def cost_summary(self) -> dict[str, float]:
         raise NotImplementedError("Cost tracking is not implemented for the Sub-RLM.")
@@ -342,6 +412,8 @@ class REPLEnv:
     
     def __del__(self):
         """Clean up temporary directory when object is destroyed"""
+        if isinstance(getattr(self, "sub_rlm", None), ModalSandboxSubRLM):
+            self.sub_rlm.close()
         try:
             import shutil
             shutil.rmtree(self.temp_dir)
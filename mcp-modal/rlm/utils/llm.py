@@ -10,13 +10,15 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class OpenAIClient:
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-5"):
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-5", max_retries: Optional[int] = None):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass api_key parameter.")
         
         self.model = model
-        self.client = OpenAI(api_key=self.api_key)
+        # None keeps the SDK's default retry policy
+        client_kwargs = {} if max_retries is None else {"max_retries": max_retries}
+        self.client = OpenAI(api_key=self.api_key, **client_kwargs)
 
         # Implement cost tracking logic here.
     
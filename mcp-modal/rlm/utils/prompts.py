@@ -50,8 +50,10 @@ Example for a conversation transcript:
 import re
 with open(context_path, "r") as f:
     text = f.read()
-# Find natural boundaries
-turns = re.split(r'(?=\\[(?:USER|ASSISTANT)\\])', text)
+# Find natural boundaries: one linear finditer pass (compile once), then slice by offset
+turn_pat = re.compile(r'\\[(?:USER|ASSISTANT)\\]')
+bounds = [0, *(m.start() for m in turn_pat.finditer(text)), len(text)]
+turns = [text[a:b] for a, b in zip(bounds, bounds[1:]) if b > a]
 print(f"Length: {len(text)} chars, {len(turns)} conversation turns")
 print("First turn:", turns[0][:500])
 ```
@@ -1,6 +1,7 @@
 """Stdio MCP server for local dev (no Cloudflare needed).
 
-Calls Modal functions directly via .remote().
+Calls Modal functions directly via .remote.aio(), so concurrent tool calls
+don't block each other.
 
 Usage:
   claude mcp add deeprecurse --transport stdio -- python /path/to/mcp-modal/server.py
@@ -8,6 +9,9 @@ Usage:
 
 from __future__ import annotations
 
+import functools
+import threading
+
 import modal
 from mcp.server.fastmcp import FastMCP
 
@@ -16,8 +20,30 @@ MODAL_APP_NAME = "rlm-repl"
 mcp = FastMCP("deeprecurse-chat-rlm")
 
 
+@functools.cache
+def _get_query_fn() -> modal.Function:
+    return modal.Function.from_name(MODAL_APP_NAME, "run_rlm_remote")
+
+
+@functools.cache
+def _get_store_fn() -> modal.Function:
+    return modal.Function.from_name(MODAL_APP_NAME, "store_context")
+
+
+def _prewarm() -> None:
+    """Resolve the Modal function handles off the first tool call's critical path."""
+    try:
+        _get_query_fn().hydrate()
+        _get_store_fn().hydrate()
+    except Exception:
+        pass  # the tool call will retry the lookup and surface the error
+
+
+threading.Thread(target=_prewarm, daemon=True).start()
+
+
 @mcp.tool()
-def chat_rlm_query(query: str, thread_id: str) -> str:
+async def chat_rlm_query(query: str, thread_id: str) -> str:
     """Use this to query the Python RLM backend while reading/updating
     shared persistent thread context (thread_id)."""
     clean_query = query.strip()
@@ -27,8 +53,7 @@ def chat_rlm_query(query: str, thread_id: str) -> str:
     context_relpath = f"{thread_id}/context.txt"
 
     try:
-        run_rlm_remote = modal.Function.from_name(MODAL_APP_NAME, "run_rlm_remote")
-        answer = run_rlm_remote.remote(query=clean_query, context_relpath=context_relpath)
+        answer = await _get_query_fn().remote.aio(query=clean_query, context_relpath=context_relpath)
     except Exception as exc:
         return f"Error running RLM: {exc}"
 
@@ -36,7 +61,7 @@ def chat_rlm_query(query: str, thread_id: str) -> str:
 
 
 @mcp.tool()
-def upload_context(
+async def upload_context(
     transcript: str,
     session_id: str,
     thread_id: str = "transcripts",
@@ -49,8 +74,7 @@ def upload_context(
         return "Error: session_id cannot be empty."
 
     try:
-        store_context_fn = modal.Function.from_name(MODAL_APP_NAME, "store_context")
-        store_context_fn.remote(
+        await _get_store_fn().remote.aio(
             thread_id=thread_id,
             session_id=session_id,
             transcript=transcript,
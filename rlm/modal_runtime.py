@@ -24,11 +24,21 @@ image = (
 
 shared_volume = modal.Volume.from_name(MODAL_VOLUME_NAME, create_if_missing=True)
 
+# Imported at container init so memory snapshots capture the loaded package graph
+with image.imports():
+    if SOURCE_PATH_IN_IMAGE not in sys.path:
+        sys.path.insert(0, SOURCE_PATH_IN_IMAGE)
+    from rlm.rlm_repl import RLM_REPL
+
+# .env is parsed once per container, not on every warm invocation
+_env_loaded = False
+
 
 @app.function(
     image=image,
     volumes={MOUNT_PATH: shared_volume},
     timeout=3600,
+    enable_memory_snapshot=True,
 )
 def run_rlm_remote(
     query: str,
@@ -38,19 +48,16 @@ def run_rlm_remote(
     max_iterations: int = 10,
 ) -> str:
     """Run RLM_REPL on Modal with context read from a mounted volume file."""
-
-    sys.path.insert(0, SOURCE_PATH_IN_IMAGE)
-
-    from rlm.rlm_repl import RLM_REPL
-
+    global _env_loaded
     env_path = os.path.join(MOUNT_PATH, ENV_RELATIVE_PATH)
-    if os.path.exists(env_path):
+    if not _env_loaded:
+        # load_dotenv is a no-op for a missing file, so no exists() probe is needed
         load_dotenv(env_path, override=True)
+        _env_loaded = True
 
+    # A missing context file surfaces as RLM_REPL's FileNotFoundError (with the path)
     normalized_relpath = context_relpath.lstrip("/")
     context_path = os.path.join(MOUNT_PATH, normalized_relpath)
-    if not os.path.exists(context_path):
-        raise FileNotFoundError(f"Context file not found: {context_path}")
 
     rlm = RLM_REPL(
         model=model,
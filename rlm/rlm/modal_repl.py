@@ -1,23 +1,29 @@
 """
 Modal-based REPL environment with broker pattern for recursive RLM calls.
 
-This module provides a persistent Modal Sandbox with a Flask broker server
+This module provides a persistent Modal Sandbox with an aiohttp broker server
 for handling LLM requests from within the sandbox. Enables true recursive
 RLM architecture where sub-LLMs can spawn their own REPL environments.
 """
 
 from __future__ import annotations
 
-import base64
+import asyncio
+import atexit
 import json
+import queue
+import string
 import textwrap
 import threading
 import time
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Callable, Optional
 
+import aiohttp
 import modal
-import requests
 
 
 # =============================================================================
@@ -26,74 +32,81 @@ import requests
 
 _BROKER_SCRIPT = textwrap.dedent(
     '''
-import json
-import threading
+import asyncio
 import uuid
-from flask import Flask, request, jsonify
+from aiohttp import web
 
-app = Flask(__name__)
+# In-flight requests: {request_id: Future}. Waiting /enqueue calls await these on
+# the event loop, so they hold no thread and never block /pending or /respond.
+responses = {}
 
-# Request queue: {request_id: {"request": {...}, "response": None, "event": Event}}
-pending_requests = {}
-lock = threading.Lock()
+# Newly enqueued (request_id, request) pairs, handed to /pending exactly once
+new_requests = asyncio.Queue()
 
-@app.route("/health")
-def health():
-    return jsonify({"status": "ok"})
+# How long /pending blocks waiting for a request before returning empty
+LONG_POLL_TIMEOUT = 25
 
-@app.route("/enqueue", methods=["POST"])
-def enqueue():
+async def health(request):
+    return web.json_response({"status": "ok"})
+
+async def enqueue(request):
     """Called by sandbox code to submit an LLM request and wait for response."""
-    data = request.json
+    data = await request.json()
     request_id = str(uuid.uuid4())
-    event = threading.Event()
-
-    with lock:
-        pending_requests[request_id] = {
-            "request": data,
-            "response": None,
-            "event": event,
-        }
+    fut = asyncio.get_running_loop().create_future()
+    responses[request_id] = fut
+    new_requests.put_nowait((request_id, data))
 
     # Wait for response (with timeout)
-    event.wait(timeout=300)
-
-    with lock:
-        entry = pending_requests.pop(request_id, None)
-
-    if entry and entry["response"] is not None:
-        return jsonify(entry["response"])
-    else:
-        return jsonify({"error": "Request timed out"}), 504
-
-@app.route("/pending")
-def get_pending():
-    """Called by ModalREPL to get pending requests."""
-    with lock:
-        pending = [
-            {"id": rid, "request": entry["request"]}
-            for rid, entry in pending_requests.items()
-            if entry["response"] is None
-        ]
-    return jsonify({"pending": pending})
-
-@app.route("/respond", methods=["POST"])
-def respond():
+    try:
+        response = await asyncio.wait_for(fut, timeout=300)
+    except asyncio.TimeoutError:
+        return web.json_response({"error": "Request timed out"}, status=504)
+    finally:
+        responses.pop(request_id, None)
+
+    if response is None:
+        return web.json_response({"error": "Request timed out"}, status=504)
+    return web.json_response(response)
+
+async def get_pending(request):
+    """Called by ModalREPL to long-poll for new requests."""
+    try:
+        rid, data = await asyncio.wait_for(new_requests.get(), timeout=LONG_POLL_TIMEOUT)
+    except asyncio.TimeoutError:
+        return web.json_response({"pending": []})
+
+    # Hand over everything else that is already queued in the same response
+    pending = [{"id": rid, "request": data}]
+    while not new_requests.empty():
+        rid, data = new_requests.get_nowait()
+        pending.append({"id": rid, "request": data})
+    return web.json_response({"pending": pending})
+
+async def respond(request):
     """Called by ModalREPL to submit a response."""
-    data = request.json
+    data = await request.json()
     request_id = data.get("id")
     response = data.get("response")
 
-    with lock:
-        if request_id in pending_requests:
-            pending_requests[request_id]["response"] = response
-            pending_requests[request_id]["event"].set()
-            return jsonify({"status": "ok"})
-
-    return jsonify({"error": "Request not found"}), 404
+    fut = responses.pop(request_id, None)
+    if fut is None:
+        return web.json_response({"error": "Request not found"}, status=404)
+    if not fut.done():
+        fut.set_result(response)
+    return web.json_response({"status": "ok"})
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8080, threaded=True)
+    # Prompts and responses can be far larger than aiohttp's 1 MiB default body limit
+    app = web.Application(client_max_size=1024 ** 3)
+    app.add_routes([
+        web.get("/health", health),
+        web.post("/enqueue", enqueue),
+        web.get("/pending", get_pending),
+        web.post("/respond", respond),
+    ])
+    # One event loop serves every in-flight llm_query, however many there are
+    web.run_app(app, host="0.0.0.0", port=8080, print=None)
 '''
 )
 
@@ -102,109 +115,246 @@ if __name__ == "__main__":
 # Execution Script Builder
 # =============================================================================
 
-def _build_exec_script(code: str, broker_port: int = 8080, depth: int = 1) -> str:
-    """
-    Build a script that executes code with state persistence.
-    LLM queries go through the local broker server.
-    """
-    code_b64 = base64.b64encode(code.encode()).decode()
-
-    return textwrap.dedent(
-        f'''
-import sys
-import io
-import json
-import base64
-import traceback
-import os
-import requests
-
-try:
-    import dill
-except ImportError:
-    import pickle as dill
-
+# LLM helpers that reach the driver through the local broker
+_LLM_BROKER_TMPL = string.Template(textwrap.dedent(
+    '''
 # =============================================================================
 # LLM Query Functions (via local broker)
 # =============================================================================
 
-BROKER_URL = "http://127.0.0.1:{broker_port}"
+BROKER_URL = "http://127.0.0.1:$broker_port"
+
+# One keep-alive connection pool for every llm_query in this process, created on
+# first use so cells that never query the LM don't pay for importing requests
+_session = None
+
+def _get_session():
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _session = requests.Session()
+        _session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=32))
+    return _session
 
 def llm_query(prompt, model=None):
     """Query the LM via the broker."""
     try:
-        response = requests.post(
-            f"{{BROKER_URL}}/enqueue",
-            json={{"type": "single", "prompt": prompt, "model": model, "depth": {depth}}},
+        response = _get_session().post(
+            f"{BROKER_URL}/enqueue",
+            json={"type": "single", "prompt": prompt, "model": model, "depth": $depth},
             timeout=300,
         )
         data = response.json()
         if data.get("error"):
-            return f"Error: {{data['error']}}"
+            return f"Error: {data['error']}"
         return data.get("response", "Error: No response")
     except Exception as e:
-        return f"Error: LM query failed - {{e}}"
+        return f"Error: LM query failed - {e}"
 
 
 def llm_query_batched(prompts, model=None):
     """Query the LM with multiple prompts."""
     try:
-        response = requests.post(
-            f"{{BROKER_URL}}/enqueue",
-            json={{"type": "batched", "prompts": prompts, "model": model, "depth": {depth}}},
+        response = _get_session().post(
+            f"{BROKER_URL}/enqueue",
+            json={"type": "batched", "prompts": prompts, "model": model, "depth": $depth},
             timeout=300,
         )
         data = response.json()
         if data.get("error"):
-            return [f"Error: {{data['error']}}"] * len(prompts)
+            return [f"Error: {data['error']}"] * len(prompts)
         return data.get("responses", ["Error: No response"] * len(prompts))
     except Exception as e:
-        return [f"Error: LM query failed - {{e}}"] * len(prompts)
+        return [f"Error: LM query failed - {e}"] * len(prompts)
+'''
+))
+
+# Leaf REPLs (no depth left) get stubs instead: no requests import, no broker
+_LLM_DISABLED_SRC = textwrap.dedent(
+    '''
+# =============================================================================
+# LLM Query Functions (disabled: maximum recursion depth reached)
+# =============================================================================
+
+def llm_query(prompt, model=None):
+    """LLM queries are unavailable at maximum recursion depth."""
+    return "Error: LM query failed - maximum recursion depth reached"
+
 
+def llm_query_batched(prompts, model=None):
+    """LLM queries are unavailable at maximum recursion depth."""
+    return ["Error: LM query failed - maximum recursion depth reached"] * len(prompts)
+'''
+)
+
+# Worker source with $llm_functions and $session_dir slots; plain braces, no escaping
+_HARNESS_TMPL = string.Template(textwrap.dedent(
+    '''
+import sys
+import io
+import json
+import hashlib
+import pickle
+import struct
+import os
+$llm_functions
 
 # =============================================================================
 # State Management
 # =============================================================================
 
-STATE_FILE = "/tmp/rlm_state.dill"
+# Everything a session leaves behind (checkpoints, context files, files cells
+# write to relative paths) lives under SESSION_DIR, so a reset is one rm -rf
+SESSION_DIR = "$session_dir"
+
+# One file per variable; only values whose pickle changed get rewritten.
+# File layout: <u32 part count><u64 part lengths...><pickle stream><out-of-band buffers...>
+STATE_DIR = os.path.join(SESSION_DIR, "state")
+_state_hashes = {}  # var name -> digest of the bytes currently on disk
+_dill_types = set()  # types plain pickle already failed on; go straight to dill
+_unpicklable = set()  # var names that failed to serialize; retried only once rebound
+_IMMUTABLE_TYPES = (str, bytes, int, float, complex, bool, type(None), range)
+
+_dill = None
+
+def _get_dill():
+    """dill is only needed for values plain pickle rejects, so import it on first use."""
+    global _dill
+    if _dill is None:
+        try:
+            import dill as _dill
+        except ImportError:
+            _dill = pickle
+    return _dill
+
+def _dumps(v):
+    """Pickle protocol 5 with out-of-band buffers; dill for what pickle can't handle."""
+    if type(v) not in _dill_types:
+        buffers = []
+        try:
+            data = pickle.dumps(v, protocol=5, buffer_callback=buffers.append)
+            return [data, *(b.raw() for b in buffers)]
+        except Exception:
+            _dill_types.add(type(v))
+    return [_get_dill().dumps(v, protocol=5)]
+
+def _path(k):
+    return os.path.join(STATE_DIR, f"{k}.pkl")
 
 def load_state():
-    if os.path.exists(STATE_FILE):
+    state = {}
+    try:
+        names = os.listdir(STATE_DIR)
+    except FileNotFoundError:
+        return state
+    for name in names:
+        if not name.endswith(".pkl"):
+            continue
+        k = name[:-4]
         try:
-            with open(STATE_FILE, "rb") as f:
-                return dill.load(f)
+            path = os.path.join(STATE_DIR, name)
+            # Writable backing store so out-of-band buffers (arrays) load mutable
+            raw = bytearray(os.path.getsize(path))
+            with open(path, "rb") as f:
+                f.readinto(raw)
+            (n,) = struct.unpack_from("<I", raw)
+            lengths = struct.unpack_from(f"<{n}Q", raw, 4)
+            view, off, parts = memoryview(raw), 4 + 8 * n, []
+            for length in lengths:
+                parts.append(view[off:off + length])
+                off += length
+            try:
+                state[k] = pickle.loads(parts[0], buffers=parts[1:])
+            except Exception:
+                # Written by dill (functions, lambdas, ...), which needs its own unpickler
+                state[k] = _get_dill().loads(parts[0])
+            _state_hashes[k] = hashlib.blake2b(raw, digest_size=16).digest()
         except:
             pass
-    return {{}}
+    return state
 
-def save_state(state):
-    clean_state = {{}}
+def save_state(state, dirty=None):
+    """Checkpoint state; dirty is the set of names the last cell (re)bound."""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    kept = set()
     for k, v in state.items():
         if k.startswith("_"):
             continue
+        if dirty is not None and k not in dirty:
+            if k in _unpicklable:
+                continue
+            # Same immutable object as last time, so the file on disk is current.
+            # Mutable values can change in place and still go through the hash check.
+            if k in _state_hashes and type(v) in _IMMUTABLE_TYPES:
+                kept.add(k)
+                continue
         try:
-            dill.dumps(v)
-            clean_state[k] = v
+            parts = _dumps(v)
         except:
-            pass
-    with open(STATE_FILE, "wb") as f:
-        dill.dump(clean_state, f)
+            _unpicklable.add(k)
+            continue
+        _unpicklable.discard(k)
+        kept.add(k)
+        header = struct.pack(f"<I{len(parts)}Q", len(parts), *map(len, parts))
+        h = hashlib.blake2b(header, digest_size=16)
+        for part in parts:
+            h.update(part)
+        h = h.digest()
+        if _state_hashes.get(k) == h:
+            continue
+        tmp = os.path.join(STATE_DIR, f".{k}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(header)
+            for part in parts:
+                f.write(part)
+        os.replace(tmp, _path(k))
+        _state_hashes[k] = h
+    # Drop files for variables that are gone or no longer serializable
+    for k in list(_state_hashes):
+        if k not in kept:
+            try:
+                os.remove(_path(k))
+            except FileNotFoundError:
+                pass
+            del _state_hashes[k]
+
+# repr of immutable values from the last cell, keyed by id. The entry holds the
+# value itself, so the id can't be reused by another object while cached.
+_repr_cache = {}
 
 def serialize_locals(state):
-    result = {{}}
+    global _repr_cache
+    result, live = {}, {}
     for k, v in state.items():
         if k.startswith("_"):
             continue
-        try:
-            result[k] = repr(v)
-        except:
-            result[k] = f"<{{type(v).__name__}}>"
+        cached = _repr_cache.get(id(v))
+        if cached is None:
+            try:
+                cached = (v, repr(v))
+            except:
+                cached = (v, f"<{type(v).__name__}>")
+        # Exact types only: subclasses may carry mutable state that changes repr
+        if type(v) in _IMMUTABLE_TYPES:
+            live[id(v)] = cached
+        result[k] = cached[1]
+    _repr_cache = live
     return result
 
 # =============================================================================
 # Execution
 # =============================================================================
 
+# Result frames go out on a private copy of fd 1; anything else writing to fd 1
+# (subprocesses, C extensions) lands in /dev/null instead of corrupting the stream
+_frames = os.fdopen(os.dup(1), "w")
+os.dup2(os.open(os.devnull, os.O_WRONLY), 1)
+
+os.makedirs(SESSION_DIR, exist_ok=True)
+os.chdir(SESSION_DIR)
+
 _locals = load_state()
 
 def FINAL_VAR(variable_name):
@@ -213,54 +363,91 @@ def FINAL_VAR(variable_name):
         return str(_locals[variable_name])
     available = [k for k in _locals.keys() if not k.startswith("_")]
     if available:
-        return f"Error: Variable '{{variable_name}}' not found. Available variables: {{available}}. You must create and assign a variable BEFORE calling FINAL_VAR on it."
-    return f"Error: Variable '{{variable_name}}' not found. No variables have been created yet. You must create and assign a variable in a REPL block BEFORE calling FINAL_VAR on it."
+        return f"Error: Variable '{variable_name}' not found. Available variables: {available}. You must create and assign a variable BEFORE calling FINAL_VAR on it."
+    return f"Error: Variable '{variable_name}' not found. No variables have been created yet. You must create and assign a variable in a REPL block BEFORE calling FINAL_VAR on it."
 
 def SHOW_VARS():
-    available = {{k: type(v).__name__ for k, v in _locals.items() if not k.startswith("_")}}
+    available = {k: type(v).__name__ for k, v in _locals.items() if not k.startswith("_")}
     if not available:
         return "No variables created yet. Use ```repl``` blocks to create variables."
-    return f"Available variables: {{available}}"
+    return f"Available variables: {available}"
 
-_globals = {{
+_globals = {
     "__builtins__": __builtins__,
     "__name__": "__main__",
     "llm_query": llm_query,
     "llm_query_batched": llm_query_batched,
     "FINAL_VAR": FINAL_VAR,
     "SHOW_VARS": SHOW_VARS,
-}}
-
-code = base64.b64decode("{code_b64}").decode()
-
-stdout_buf = io.StringIO()
-stderr_buf = io.StringIO()
-old_stdout, old_stderr = sys.stdout, sys.stderr
-
-try:
-    sys.stdout = stdout_buf
-    sys.stderr = stderr_buf
-    combined = {{**_globals, **_locals}}
-    exec(code, combined, combined)
-    for key, value in combined.items():
-        if key not in _globals and not key.startswith("_"):
-            _locals[key] = value
-except Exception as e:
-    traceback.print_exc(file=stderr_buf)
-finally:
-    sys.stdout = old_stdout
-    sys.stderr = old_stderr
-
-save_state(_locals)
-
-result = {{
-    "stdout": stdout_buf.getvalue(),
-    "stderr": stderr_buf.getvalue(),
-    "locals": serialize_locals(_locals),
-}}
-print(json.dumps(result))
+}
+
+# One namespace for the life of the worker, so functions defined in earlier
+# cells see variables bound in later ones
+combined = {**_globals, **_locals}
+
+for frame in sys.stdin.buffer:
+    code = json.loads(frame)["code"]
+
+    stdout_buf = io.StringIO()
+    stderr_buf = io.StringIO()
+    old_stdout, old_stderr = sys.stdout, sys.stderr
+
+    before = combined.copy()
+    try:
+        sys.stdout = stdout_buf
+        sys.stderr = stderr_buf
+        exec(code, combined, combined)
+    except BaseException:
+        import traceback
+
+        traceback.print_exc(file=stderr_buf)
+    finally:
+        sys.stdout = old_stdout
+        sys.stderr = old_stderr
+
+    # Only names the cell bound, rebound or deleted need syncing into _locals
+    _dirty_keys = {
+        k for k, v in combined.items()
+        if before.get(k, before) is not v and k not in _globals and not k.startswith("_")
+    }
+    for k in _dirty_keys:
+        _locals[k] = combined[k]
+    for k in before.keys() - combined.keys():
+        _locals.pop(k, None)
+
+    save_state(_locals, _dirty_keys)
+
+    result = {
+        "stdout": stdout_buf.getvalue(),
+        "stderr": stderr_buf.getvalue(),
+        "locals": serialize_locals(_locals),
+    }
+    _frames.write(json.dumps(result) + "\\n")
+    _frames.flush()
+
+# stdin closed: exit now rather than wait on threads a cell may have left running
+os._exit(0)
 '''
-    )
+))
+
+
+def _build_exec_script(
+    broker_port: int = 8080,
+    depth: int = 1,
+    enable_llm: bool = True,
+    session_dir: str = "/tmp/rlm_session",
+) -> str:
+    """
+    Build the long-lived worker script: it reads one JSON code frame per line from
+    stdin and answers each with one JSON result line, keeping variables in memory.
+    State is still checkpointed to disk so a restarted worker can pick up where
+    the last one left off. LLM queries go through the local broker server.
+    """
+    if enable_llm:
+        llm_functions = _LLM_BROKER_TMPL.substitute(broker_port=broker_port, depth=depth)
+    else:
+        llm_functions = _LLM_DISABLED_SRC
+    return _HARNESS_TMPL.substitute(llm_functions=llm_functions, session_dir=session_dir)
 
 
 # =============================================================================
@@ -278,6 +465,29 @@ class REPLResult:
         return f"REPLResult(stdout={self.stdout}, stderr={self.stderr}, locals={self.locals}, execution_time={self.execution_time})"
 
 
+# =============================================================================
+# Sandbox Pool
+# =============================================================================
+
+# Idle, reset ModalREPLs keyed by everything baked into their sandbox and harness
+_SANDBOX_POOL: dict[tuple, queue.Queue] = {}
+_POOL_MAX_IDLE = 4  # per key; extra instances are torn down on release
+
+
+def _drain_sandbox_pool():
+    for idle in _SANDBOX_POOL.values():
+        while True:
+            try:
+                idle.get_nowait().cleanup()
+            except queue.Empty:
+                break
+            except Exception:
+                pass
+
+
+atexit.register(_drain_sandbox_pool)
+
+
 # =============================================================================
 # ModalREPL Class
 # =============================================================================
@@ -295,6 +505,10 @@ class ModalREPL:
     """
 
     BROKER_PORT = 8080
+    HARNESS_PATH = "/tmp/rlm_harness.py"
+    SESSION_DIR = "/tmp/rlm_session"  # per-session scratch dir and cwd; wiped by reset()
+    LONG_POLL_TIMEOUT = 25  # must match the broker's /pending wait
+    BROKER_READY_TIMEOUT = 30
 
     def __init__(
         self,
@@ -327,6 +541,8 @@ class ModalREPL:
         self.lm_handler = lm_handler
         self.depth = depth
         self.max_depth = max_depth
+        # Sub-LLM calls run at depth + 1; past max_depth there is no broker or poller
+        self.enable_llm = depth + 1 <= max_depth
         self.app_name = app_name
         self.timeout = timeout
         self.volumes = volumes or {}
@@ -342,9 +558,19 @@ class ModalREPL:
         self.sandbox = None
         self.broker_process = None
         self.broker_url: str | None = None
+        # Broker poller: one event loop on a daemon thread, one task per LLM request
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._poll_task: asyncio.Task | None = None
         self.poller_thread: threading.Thread | None = None
-        self.poller_stop = threading.Event()
+        self.worker = None  # Long-lived harness process; one cell in flight at a time
+        self._worker_replies = None
+        self._worker_stderr: deque[str] = deque(maxlen=1000)  # stray fd 2 output, not yet reported
+        self._stderr_thread: threading.Thread | None = None
+        self._exec_lock = threading.Lock()
+        # lm_handler is blocking, so the poller's tasks run it here
+        self._lm_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="rlm-lm")
         self.locals = {}  # Synced from sandbox
+        self._pool_key: tuple | None = None  # Set when handed out by acquire()
 
         # Setup sandbox and broker
         self.setup()
@@ -359,11 +585,111 @@ class ModalREPL:
         if setup_code:
             self.code_execution(setup_code)
 
+    @staticmethod
+    def _make_pool_key(app_name, image, volumes, timeout, depth, max_depth) -> tuple:
+        # Pooled instances hold their image/volumes, so these ids stay valid while pooled
+        mounts = tuple((path, id(volume)) for path, volume in sorted((volumes or {}).items()))
+        return (app_name, None if image is None else id(image), mounts, timeout, depth, max_depth)
+
+    @classmethod
+    def acquire(
+        cls,
+        lm_handler: Callable[[str, Optional[str], int], str],
+        depth: int = 0,
+        max_depth: int = 3,
+        app_name: str = "rlm-sandbox",
+        image: modal.Image | None = None,
+        volumes: dict[str, modal.Volume] | None = None,
+        timeout: int = 600,
+        context_payload: dict | list | str | None = None,
+        context_path: str | None = None,
+        setup_code: str | None = None,
+    ) -> "ModalREPL":
+        """
+        Take a warmed ModalREPL from the pool, or build one if none is idle.
+        Same arguments as the constructor; give it back with release() or a with block.
+        """
+        key = cls._make_pool_key(app_name, image, volumes, timeout, depth, max_depth)
+        idle = _SANDBOX_POOL.get(key)
+        while idle is not None:
+            try:
+                repl = idle.get_nowait()
+            except queue.Empty:
+                break
+            # Skip sandboxes that hit their timeout while idle
+            try:
+                alive = repl.sandbox.poll() is None
+            except Exception:
+                alive = False
+            if not alive:
+                repl.cleanup()
+                continue
+
+            repl.lm_handler = lm_handler
+            repl._pool_key = key
+            if context_payload is not None:
+                repl.load_context(context_payload)
+            elif context_path is not None:
+                repl.load_context_from_path(context_path)
+            if setup_code:
+                repl.code_execution(setup_code)
+            return repl
+
+        repl = cls(
+            lm_handler,
+            depth=depth,
+            max_depth=max_depth,
+            app_name=app_name,
+            image=image,
+            volumes=volumes,
+            timeout=timeout,
+            context_payload=context_payload,
+            context_path=context_path,
+            setup_code=setup_code,
+        )
+        repl._pool_key = key
+        return repl
+
+    def release(self):
+        """Reset the sandbox's REPL state and return it to the pool (or tear it down)."""
+        key, self._pool_key = self._pool_key, None
+        if key is None or self.sandbox is None:
+            self.cleanup()
+            return
+        try:
+            self.reset()
+            _SANDBOX_POOL.setdefault(key, queue.Queue(maxsize=_POOL_MAX_IDLE)).put_nowait(self)
+        except Exception:
+            # Reset failed or the pool for this key is full
+            self.cleanup()
+
+    def reset(self):
+        """
+        Return the sandbox to a fresh-session state: the worker is replaced by a new
+        interpreter and SESSION_DIR (checkpoints, context files, cell scratch files)
+        is wiped, so nothing from the previous session is left to read.
+        """
+        with self._exec_lock:
+            if self.worker is not None:
+                # EOF ends the harness loop; it exits without waiting on stray threads
+                self.worker.stdin.write_eof()
+                self.worker.stdin.drain()
+                self.worker.wait()
+                self._stderr_thread.join(timeout=5)
+                self.worker = None
+                self._worker_replies = None
+            process = self.sandbox.exec("rm", "-rf", self.SESSION_DIR)
+            if process.wait() != 0:
+                raise RuntimeError(f"Failed to clear {self.SESSION_DIR} in sandbox: {process.stderr.read()}")
+            self._take_worker_stderr()
+            self._start_worker()
+        self.locals = {}
+
     def _create_default_image(self) -> modal.Image:
         """Create default Modal image with common packages for sandbox execution."""
         return (
             modal.Image.debian_slim(python_version="3.12")
-            .pip_install("flask", "requests", "dill")
+            .pip_install("aiohttp", "requests", "dill")
         )
 
     def setup(self):
@@ -376,96 +702,177 @@ class ModalREPL:
             "app": self.app,
             "image": self.image,
             "timeout": self.timeout,
-            "encrypted_ports": [self.BROKER_PORT],
         }
+        if self.enable_llm:
+            create_kwargs["encrypted_ports"] = [self.BROKER_PORT]
         if self.volumes:
             create_kwargs["volumes"] = self.volumes
 
         self.sandbox = modal.Sandbox.create(**create_kwargs)
 
         # Start the broker server in the sandbox
-        self.broker_process = self.sandbox.exec(
-            "python",
-            "-c",
-            _BROKER_SCRIPT,
+        if self.enable_llm:
+            self.broker_process = self.sandbox.exec(
+                "python",
+                "-c",
+                _BROKER_SCRIPT,
+            )
+
+        # Port and depth are fixed for this REPL, so render the harness once and
+        # leave it in the sandbox; each cell then only ships its own code
+        self._write_file(
+            self.HARNESS_PATH,
+            _build_exec_script(self.BROKER_PORT, self.depth + 1, self.enable_llm, self.SESSION_DIR),
         )
 
-        # Wait for broker to be ready
-        time.sleep(2)
+        self._start_worker()
 
-        # Get the tunnel URL
-        tunnels = self.sandbox.tunnels()
-        if self.BROKER_PORT in tunnels:
-            self.broker_url = tunnels[self.BROKER_PORT].url
+        if not self.enable_llm:
+            return
+
+        self._wait_for_broker()
 
         # Start polling thread
-        self.poller_stop.clear()
-        self.poller_thread = threading.Thread(target=self._poll_broker, daemon=True)
+        self._loop = asyncio.new_event_loop()
+        self._poll_task = self._loop.create_task(self._poll_broker())
+        self.poller_thread = threading.Thread(target=self._run_poller, daemon=True)
         self.poller_thread.start()
 
-    def _poll_broker(self):
-        """Poll the broker for pending LLM requests and handle them."""
-        while not self.poller_stop.is_set():
+    def _wait_for_broker(self):
+        """Poll the tunnel until the broker answers /health, instead of a fixed sleep."""
+        deadline = time.monotonic() + self.BROKER_READY_TIMEOUT
+        while True:
             try:
-                # Get pending requests
-                resp = requests.get(
-                    f"{self.broker_url}/pending",
-                    timeout=5,
-                )
-                pending = resp.json().get("pending", [])
-
-                for item in pending:
-                    request_id = item["id"]
-                    req_data = item["request"]
-
-                    # Handle the request
-                    response = self._handle_llm_request(req_data)
-
-                    # Send response back
-                    requests.post(
-                        f"{self.broker_url}/respond",
-                        json={"id": request_id, "response": response},
-                        timeout=10,
-                    )
-
-            except requests.exceptions.RequestException:
-                pass
+                # The tunnel can lag sandbox startup, so look it up inside the retry loop
+                if self.broker_url is None:
+                    tunnels = self.sandbox.tunnels()
+                    if self.BROKER_PORT in tunnels:
+                        self.broker_url = tunnels[self.BROKER_PORT].url
+                if self.broker_url is not None:
+                    with urllib.request.urlopen(f"{self.broker_url}/health", timeout=1) as resp:
+                        if resp.status == 200:
+                            return
             except Exception:
                 pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Broker did not become ready within {self.BROKER_READY_TIMEOUT}s")
+            time.sleep(0.05)
 
-            time.sleep(0.1)
+    def _run_poller(self):
+        try:
+            self._loop.run_until_complete(self._poll_task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    def _start_worker(self):
+        """Start the harness worker; it reloads any checkpointed state on startup."""
+        self.worker = self.sandbox.exec("python", "-u", self.HARNESS_PATH, bufsize=1)
+        self._worker_replies = iter(self.worker.stdout)
+        # Keep the stderr pipe drained so a chatty cell can't fill it and stall the worker
+        self._stderr_thread = threading.Thread(
+            target=self._drain_stderr, args=(self.worker,), daemon=True
+        )
+        self._stderr_thread.start()
+
+    def _drain_stderr(self, worker):
+        """Collect worker stderr lines as they arrive; reported with the next result."""
+        try:
+            for line in worker.stderr:
+                self._worker_stderr.append(line)
+        except Exception:
+            pass
 
-    def _handle_llm_request(self, req_data: dict) -> dict:
+    def _take_worker_stderr(self) -> str:
+        lines = []
+        while self._worker_stderr:
+            lines.append(self._worker_stderr.popleft())
+        return "".join(lines)
+
+    def _write_file(self, path: str, data: str):
+        """Write a file into the sandbox by piping it through cat."""
+        process = self.sandbox.exec("sh", "-c", 'mkdir -p "${0%/*}" && cat > "$0"', path)
+        process.stdin.write(data.encode("utf-8"))
+        process.stdin.write_eof()
+        process.stdin.drain()
+        if process.wait() != 0:
+            raise RuntimeError(f"Failed to write {path} in sandbox: {process.stderr.read()}")
+
+    async def _poll_broker(self):
+        """Long-poll the broker for pending LLM requests and handle them."""
+        connector = aiohttp.TCPConnector(limit=32, keepalive_timeout=60)
+        poll_timeout = aiohttp.ClientTimeout(total=self.LONG_POLL_TIMEOUT + 5)
+        tasks = set()
+        async with aiohttp.ClientSession(connector=connector) as session:
+            try:
+                while True:
+                    try:
+                        # Long-poll: the broker holds this open until a request arrives
+                        async with session.get(f"{self.broker_url}/pending", timeout=poll_timeout) as resp:
+                            pending = (await resp.json()).get("pending", [])
+                    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                        # Broker not reachable (yet); back off instead of spinning
+                        await asyncio.sleep(0.5)
+                        continue
+
+                    for item in pending:
+                        task = asyncio.create_task(self._handle_and_respond(session, item))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    async def _handle_and_respond(self, session: aiohttp.ClientSession, item: dict):
+        """Handle one broker request and post its response back."""
+        try:
+            response = await self._handle_llm_request(item["request"])
+        except Exception as e:
+            response = {"error": f"LM handler failed - {e}"}
+        try:
+            async with session.post(
+                f"{self.broker_url}/respond",
+                json={"id": item["id"], "response": response},
+                timeout=aiohttp.ClientTimeout(total=10),
+            ) as resp:
+                await resp.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+
+    async def _handle_llm_request(self, req_data: dict) -> dict:
         """Handle an LLM request from the sandbox."""
         req_type = req_data.get("type")
         model = req_data.get("model")
         depth = req_data.get("depth", self.depth + 1)
+        loop = asyncio.get_running_loop()
 
         if req_type == "single":
             prompt = req_data.get("prompt")
-            response = self.lm_handler(prompt, model, depth)
+            response = await loop.run_in_executor(self._lm_pool, self.lm_handler, prompt, model, depth)
             return {"response": response}
 
         elif req_type == "batched":
             prompts = req_data.get("prompts", [])
-            # Handle batched requests by calling lm_handler for each
-            responses = []
-            for prompt in prompts:
-                response = self.lm_handler(prompt, model, depth)
-                responses.append(response)
-            return {"responses": responses}
+            # Run the batch concurrently; results keep prompt order
+            responses = await asyncio.gather(
+                *(loop.run_in_executor(self._lm_pool, self.lm_handler, prompt, model, depth) for prompt in prompts)
+            )
+            return {"responses": list(responses)}
 
         return {"error": "Unknown request type"}
 
     def load_context(self, context_payload: dict | list | str):
         """Load context into the sandbox environment."""
+        # Ship the payload as a file rather than escaping it into cell source
         if isinstance(context_payload, str):
-            escaped = context_payload.replace("\\", "\\\\").replace('"""', '\\"\\"\\"')
-            context_code = f'context = """{escaped}"""'
+            path = f"{self.SESSION_DIR}/context.txt"
+            self._write_file(path, context_payload)
+            context_code = f'with open("{path}", "r", encoding="utf-8") as f: context = f.read()'
         else:
-            context_json = json.dumps(context_payload)
-            escaped_json = context_json.replace("\\", "\\\\").replace("'", "\\'")
-            context_code = f"import json; context = json.loads('{escaped_json}')"
+            path = f"{self.SESSION_DIR}/context.json"
+            self._write_file(path, json.dumps(context_payload))
+            context_code = f'import json\nwith open("{path}", "r", encoding="utf-8") as f: context = json.load(f)'
 
         self.code_execution(context_code)
 
@@ -479,21 +886,30 @@ class ModalREPL:
         """Execute code in the Modal sandbox and return result."""
         start_time = time.perf_counter()
 
-        # Build and execute the script
-        script = _build_exec_script(code, self.BROKER_PORT, self.depth + 1)
-        process = self.sandbox.exec("python", "-c", script)
-
-        # Read output
-        stdout = process.stdout.read()
-        stderr = process.stderr.read()
+        # Newline-delimited JSON frames; json.dumps escapes any newlines in the code
+        frame = json.dumps({"code": code}) + "\n"
+
+        with self._exec_lock:
+            if self.worker is None:
+                self._start_worker()
+            self.worker.stdin.write(frame.encode("utf-8"))
+            self.worker.stdin.drain()
+            stdout = next(self._worker_replies, None)
+            if stdout is None:
+                # Worker died (e.g. os._exit in a cell); the next cell restarts it
+                stdout = ""
+                self._stderr_thread.join(timeout=5)
+                stderr = self._take_worker_stderr() or "REPL worker exited unexpectedly"
+                self.worker = None
+                self._worker_replies = None
+            else:
+                stderr = self._take_worker_stderr()
 
         execution_time = time.perf_counter() - start_time
 
         # Parse the JSON result
         try:
-            lines = stdout.strip().split("\n")
-            result_json = lines[-1] if lines else "{}"
-            result = json.loads(result_json)
+            result = json.loads(stdout)
 
             # Update local copy of variables
             self.locals = result.get("locals", {})
@@ -516,10 +932,15 @@ class ModalREPL:
         """Terminate the sandbox and stop polling."""
         # Stop the poller thread
         if self.poller_thread is not None:
-            self.poller_stop.set()
+            self._loop.call_soon_threadsafe(self._poll_task.cancel)
             self.poller_thread.join(timeout=2)
             self.poller_thread = None
 
+        self._lm_pool.shutdown(wait=False, cancel_futures=True)
+
+        self.worker = None
+        self._worker_replies = None
+
         if self.sandbox is not None:
             try:
                 self.sandbox.terminate()
@@ -531,7 +952,10 @@ class ModalREPL:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.cleanup()
+        if self._pool_key is not None:
+            self.release()
+        else:
+            self.cleanup()
         return False
 
     def __del__(self):
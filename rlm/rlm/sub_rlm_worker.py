@@ -1,8 +1,8 @@
 """Modal sandbox worker for sub-RLM calls.
 
-Protocol:
-- Reads a single JSON payload from stdin.
-- Emits model response text to stdout.
+Protocol (newline-delimited JSON, one request in flight at a time):
+- Reads one JSON payload per line from stdin until EOF.
+- Emits one JSON line per payload to stdout: {"response": ...} or {"error": ...}.
 """
 
 from __future__ import annotations
@@ -15,30 +15,36 @@ from dotenv import load_dotenv
 from rlm.utils.llm import OpenAIClient
 
 
-def _read_payload() -> dict:
-    raw = sys.stdin.buffer.read()
-    if not raw:
-        raise ValueError("No payload received on stdin")
-    return json.loads(raw.decode("utf-8"))
-
-
 def main() -> int:
-    try:
-        payload = _read_payload()
-        env_file_path = payload.get("env_file_path")
-        if env_file_path:
-            load_dotenv(env_file_path, override=True)
-
-        prompt = payload.get("prompt")
-        model = payload.get("model", "gpt-5")
-
-        client = OpenAIClient(model=model)
-        response = client.completion(messages=prompt, timeout=300)
-        sys.stdout.write(response or "")
-        return 0
-    except Exception as exc:
-        sys.stderr.write(str(exc))
-        return 1
+    loaded_env_file = None
+    clients: dict[str, OpenAIClient] = {}
+
+    for line in sys.stdin.buffer:
+        if not line.strip():
+            continue
+        try:
+            payload = json.loads(line)
+            env_file_path = payload.get("env_file_path")
+            if env_file_path and env_file_path != loaded_env_file:
+                load_dotenv(env_file_path, override=True)
+                loaded_env_file = env_file_path
+
+            prompt = payload.get("prompt")
+            model = payload.get("model", "gpt-5")
+
+            # Reuse the client (and its HTTP connection pool) across payloads. No SDK
+            # retries: the parent's reply deadline must cover the whole request
+            client = clients.get(model)
+            if client is None:
+                client = clients[model] = OpenAIClient(model=model, max_retries=0)
+            response = client.completion(messages=prompt, timeout=payload.get("timeout", 300))
+            reply = {"response": response or ""}
+        except Exception as exc:
+            reply = {"error": str(exc)}
+
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+    return 0
 
 
 if __name__ == "__main__":
@@ -15,9 +15,15 @@ def generate_session_id():
     return str(uuid.uuid4())
 
 
-def generate_timestamp(base_time, offset_seconds=0):
-    """Generate ISO timestamp"""
-    return (base_time + timedelta(seconds=offset_seconds)).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+def generate_timestamps(base_time, count, step_seconds=30):
+    """Generate count ISO timestamps, step_seconds apart"""
+    step = timedelta(seconds=step_seconds)
+    stamps = []
+    t = base_time
+    for _ in range(count):
+        stamps.append(t.isoformat(timespec="milliseconds") + "Z")
+        t += step
+    return stamps
 
 
 def create_metadata(session_id, message_count, start_time, end_time):
@@ -114,20 +120,18 @@ def generate_conversation(template_type, num_exchanges=None):
 
 def format_transcript(session_id, conversation, start_time):
     """Format conversation as transcript"""
-    current_time = start_time
-    messages = []
-
-    for i, (role, content) in enumerate(conversation):
-        timestamp = generate_timestamp(current_time, i * 30)  # 30 seconds between messages
-        messages.append(f"[{role}] [{timestamp}]\n{content}\n\n---\n")
-
-    end_time = generate_timestamp(current_time, len(conversation) * 30)
+    # 30 seconds between messages; the extra stamp is the session end time
+    stamps = generate_timestamps(start_time, len(conversation) + 1)
+    messages = [
+        f"[{role}] [{timestamp}]\n{content}\n\n---\n"
+        for (role, content), timestamp in zip(conversation, stamps)
+    ]
 
     metadata = create_metadata(
         session_id=session_id,
         message_count=len(conversation),
-        start_time=generate_timestamp(current_time, 0),
-        end_time=end_time
+        start_time=stamps[0],
+        end_time=stamps[-1]
     )
 
     return metadata + "\n".join(messages)
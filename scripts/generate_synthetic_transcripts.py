@@ -8,27 +8,33 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+try:
+    from orjson import dumps as json_dumps  # returns UTF-8 bytes
+except ImportError:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
 
-WORDS = [
+
+WORDS = (
     "alpha", "bravo", "charlie", "delta", "echo", "foxtrot",
     "golf", "hotel", "india", "juliet", "kilo", "lima",
     "micro", "nano", "omega", "pixel", "quantum", "radar",
     "signal", "tensor", "vector", "widget", "zenith",
-]
+)
 
-NAMES = [
+NAMES = (
     "Avery", "Blake", "Casey", "Devon", "Emery", "Finley",
     "Harper", "Jordan", "Kai", "Logan", "Morgan", "Parker",
     "Quinn", "Riley", "Rowan", "Sawyer", "Taylor", "Tatum",
-]
+)
 
-DEPLOY_WINDOWS = [
+DEPLOY_WINDOWS = (
     "Monday 10am PT",
     "Tuesday 2pm PT",
     "Wednesday 3pm PT",
     "Thursday 11am PT",
     "Friday 4pm PT",
-]
+)
 
 
 @dataclass
@@ -38,54 +44,59 @@ class FactSet:
     release_owner: str
 
 
-def random_sentence(word_count: int) -> str:
-    return " ".join(random.choice(WORDS) for _ in range(word_count)).capitalize() + "."
+def random_sentence(word_count: int, rng: random.Random) -> str:
+    return " ".join(rng.choices(WORDS, k=word_count)).capitalize() + "."
+
+
+def _utc_iso(dt: datetime) -> str:
+    """ISO timestamp with a Z suffix; UTC isoformat() always ends in "+00:00"."""
+    return dt.isoformat()[:-6] + "Z"
+
+
+_SEP = "=" * 72
+_METADATA_TMPL = (
+    f"{_SEP}\n"
+    "SESSION METADATA\n"
+    f"{_SEP}\n"
+    "session_id:      {session_id}\n"
+    "developer:       synthetic-user\n"
+    "email:           synthetic@example.com\n"
+    "hostname:        dev-machine\n"
+    "platform:        Darwin\n"
+    "os_user:         tester\n"
+    "git_branch:      modal\n"
+    "project_dir:     /Users/tester/DeepRecurse\n"
+    "claude_version:  2.1.99\n"
+    "message_count:   {message_count}\n"
+    "start_time:      {start}\n"
+    "end_time:        {end}\n"
+    "uploaded_at:     {uploaded_at}\n"
+    f"{_SEP}\n"
+)
 
 
 def build_metadata(session_id: str, message_count: int, start: datetime, end: datetime) -> str:
-    return "\n".join(
-        [
-            "========================================================================",
-            "SESSION METADATA",
-            "========================================================================",
-            f"session_id:      {session_id}",
-            "developer:       synthetic-user",
-            "email:           synthetic@example.com",
-            "hostname:        dev-machine",
-            "platform:        Darwin",
-            "os_user:         tester",
-            "git_branch:      modal",
-            "project_dir:     /Users/tester/DeepRecurse",
-            "claude_version:  2.1.99",
-            f"message_count:   {message_count}",
-            f"start_time:      {start.isoformat().replace('+00:00', 'Z')}",
-            f"end_time:        {end.isoformat().replace('+00:00', 'Z')}",
-            f"uploaded_at:     {datetime.now(timezone.utc).isoformat()}",
-            "========================================================================",
-            "",
-        ]
+    return _METADATA_TMPL.format(
+        session_id=session_id,
+        message_count=message_count,
+        start=_utc_iso(start),
+        end=_utc_iso(end),
+        uploaded_at=datetime.now(timezone.utc).isoformat(),
     )
 
 
-def build_message(role: str, timestamp: datetime, content: str) -> str:
-    return "\n".join(
-        [
-            f"[{role}] [{timestamp.isoformat().replace('+00:00', 'Z')}]",
-            content,
-            "",
-            "---",
-            "",
-        ]
-    )
+def build_message(role: str, timestamp: str, content: str) -> str:
+    return f"[{role}] [{timestamp}]\n{content}\n\n---\n"
 
 
-def generate_transcript(message_count: int, seed: int) -> tuple[str, FactSet]:
-    random.seed(seed)
+def generate_transcript(message_count: int, seed: int) -> tuple[str, FactSet, str]:
+    # Private generator: same sequence as random.seed(seed), without touching global state
+    rng = random.Random(seed)
     session_id = f"synthetic-{uuid.uuid4().hex[:8]}"
 
-    release_owner = random.choice(NAMES)
-    rollback_code = f"MONO-{random.randint(10, 99)}"
-    deployment_window = random.choice(DEPLOY_WINDOWS)
+    release_owner = rng.choice(NAMES)
+    rollback_code = f"MONO-{rng.randint(10, 99)}"
+    deployment_window = rng.choice(DEPLOY_WINDOWS)
     facts = FactSet(
         deployment_window=deployment_window,
         rollback_code=rollback_code,
@@ -93,8 +104,9 @@ def generate_transcript(message_count: int, seed: int) -> tuple[str, FactSet]:
     )
 
     start = datetime(2026, 2, 15, 16, 0, 0, tzinfo=timezone.utc)
-    current = start
     step = timedelta(seconds=45)
+    # Fixed cadence, so format every stamp up front
+    stamps = [_utc_iso(start + i * step) for i in range(message_count)]
 
     messages: list[str] = []
     for i in range(message_count):
@@ -106,12 +118,11 @@ def generate_transcript(message_count: int, seed: int) -> tuple[str, FactSet]:
                 f"The release owner is {facts.release_owner}."
             )
         else:
-            content = random_sentence(random.randint(8, 16))
-        messages.append(build_message(role, current, content))
-        current += step
+            content = random_sentence(rng.randint(8, 16), rng)
+        messages.append(build_message(role, stamps[i], content))
 
-    header = build_metadata(session_id, message_count, start, current - step)
-    return header + "\n".join(messages), facts
+    header = build_metadata(session_id, message_count, start, start + (message_count - 1) * step)
+    return header + "\n".join(messages), facts, session_id
 
 
 def main() -> None:
@@ -126,28 +137,28 @@ def main() -> None:
     out_dir.mkdir(parents=True, exist_ok=True)
 
     answers_path = out_dir / "answers.jsonl"
-    with answers_path.open("w", encoding="utf-8") as answers_file:
-        for i in range(args.num_files):
-            transcript, facts = generate_transcript(args.messages, args.seed + i)
-            session_id = transcript.splitlines()[3].split()[-1]
-            transcript_path = out_dir / f"{session_id}.txt"
-            transcript_path.write_text(transcript, encoding="utf-8")
-
-            answers_file.write(
-                json.dumps(
-                    {
-                        "session_id": session_id,
-                        "deployment_window": facts.deployment_window,
-                        "rollback_code": facts.rollback_code,
-                        "release_owner": facts.release_owner,
-                        "query": (
-                            "From the transcript, what is the deployment window, "
-                            "rollback code, and release owner?"
-                        ),
-                    }
-                )
-                + "\n"
+    records: list[bytes] = []
+    for i in range(args.num_files):
+        transcript, facts, session_id = generate_transcript(args.messages, args.seed + i)
+        transcript_path = out_dir / f"{session_id}.txt"
+        transcript_path.write_bytes(transcript.encode("utf-8"))
+
+        records.append(
+            json_dumps(
+                {
+                    "session_id": session_id,
+                    "deployment_window": facts.deployment_window,
+                    "rollback_code": facts.rollback_code,
+                    "release_owner": facts.release_owner,
+                    "query": (
+                        "From the transcript, what is the deployment window, "
+                        "rollback code, and release owner?"
+                    ),
+                }
             )
+            + b"\n"
+        )
+    answers_path.write_bytes(b"".join(records))
 
     print(f"Wrote {args.num_files} transcripts to {out_dir}")
     print(f"Wrote answer key to {answers_path}")
@@ -82,6 +82,7 @@ os_user   = getpass.getuser()
 # Parse JSONL transcript
 # ---------------------------------------------------------------------------
 turns = []
+seen_records = set()  # uuid (or timestamp) of every kept record
 git_branch = None
 project_dir = None
 claude_version = None
@@ -114,6 +115,14 @@ with open(transcript_path) as f:
         content = msg.get("content", "")
         timestamp = entry.get("timestamp")
 
+        # Skip records written to the transcript twice; repeated turns with equal
+        # text are separate records and are kept
+        record_key = entry.get("uuid") or (timestamp and (entry_type, timestamp))
+        if record_key:
+            if record_key in seen_records:
+                continue
+            seen_records.add(record_key)
+
         if timestamp:
             if start_time is None:
                 start_time = timestamp
@@ -187,7 +196,7 @@ payload = json.dumps({
     "session_id": session_id,
     "thread_id":  thread_id,
     "developer":  developer,
-}).encode()
+}, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
 
 req = urllib.request.Request(
     upload_url,
@@ -7,52 +7,158 @@ Usage:
     python scripts/upload_context.py --all              # Upload all sessions for this project
 """
 
+import collections
+import functools
 import getpass
+import io
 import json
 import os
 import platform
 import socket
 import subprocess
 import sys
-from datetime import datetime, timezone
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import modal
 
+try:
+    import orjson
+    from orjson import loads as json_loads  # SIMD parser, takes bytes directly
+
+    def json_dumps_pretty(obj) -> bytes:
+        """Indented UTF-8 JSON, encoded straight to bytes."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps_pretty(obj) -> bytes:
+        """Indented UTF-8 JSON, encoded straight to bytes."""
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
 VOLUME_NAME = "rlm-context"
 PROJECT_DIR = "-Users-dmytro-Desktop-Gits-rlm-explorations"
 SESSIONS_PATH = Path.home() / ".claude" / "projects" / PROJECT_DIR
 
-
+# Structured metadata header — agents parse this to differentiate users/sessions
+_SEP = "=" * 72
+_HEADER_TMPL = (
+    f"{_SEP}\n"
+    "SESSION METADATA\n"
+    f"{_SEP}\n"
+    "session_id:      {session_id}\n"
+    "developer:       {developer}\n"
+    "email:           {email}\n"
+    "hostname:        {hostname}\n"
+    "platform:        {platform}\n"
+    "os_user:         {os_user}\n"
+    "git_branch:      {git_branch}\n"
+    "project_dir:     {project_dir}\n"
+    "claude_version:  {claude_version}\n"
+    "message_count:   {message_count}\n"
+    "start_time:      {start_time}\n"
+    "end_time:        {end_time}\n"
+    "uploaded_at:     {uploaded_at}\n"
+    f"{_SEP}\n"
+)
+
+
+# One parsed message; turned back into a dict only when session.json is written
+Msg = collections.namedtuple("Msg", "role content timestamp")
+
+# Transcript labels for the two roles Claude Code writes; anything else falls back to .upper()
+_ROLE_UPPER = {"user": "USER", "assistant": "ASSISTANT"}
+
+
+def _utc_iso_now() -> str:
+    """Current UTC time in datetime.isoformat() layout, without building a datetime."""
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + f".{nanos // 1000:06d}+00:00"
+
+
+def _git_user_config() -> dict:
+    """Read all user.* git config keys with a single git invocation."""
+    try:
+        result = subprocess.run(
+            ["git", "config", "--get-regexp", r"^user\."],
+            capture_output=True, text=True,
+        )
+    except Exception:
+        return {}
+    if result.returncode != 0:
+        return {}
+    config = {}
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition(" ")
+        config[key] = value.strip()
+    return config
+
+
+@functools.cache
 def get_machine_metadata() -> dict:
-    """Collect machine/user identity metadata."""
-    def _git_config(key):
-        try:
-            return subprocess.check_output(
-                ["git", "config", key], stderr=subprocess.DEVNULL
-            ).decode().strip()
-        except Exception:
-            return None
+    """Collect machine/user identity metadata (computed once per process)."""
+    git_user = _git_user_config()
 
     return {
         "os_user": getpass.getuser(),
         "hostname": socket.gethostname(),
         "platform": platform.system(),
-        "git_user_name": _git_config("user.name"),
-        "git_user_email": _git_config("user.email"),
+        "git_user_name": git_user.get("user.name"),
+        "git_user_email": git_user.get("user.email"),
     }
 
 
 def get_session_files():
-    """Find all session JSONL files for this project."""
-    if not SESSIONS_PATH.exists():
+    """Find all session JSONL files for this project, oldest first."""
+    # One directory scan; DirEntry caches the stat so sorting costs no extra syscalls
+    try:
+        with os.scandir(SESSIONS_PATH) as it:
+            entries = [
+                (entry.stat().st_mtime, entry.path)
+                for entry in it
+                if entry.name.endswith(".jsonl")
+            ]
+    except FileNotFoundError:
         print(f"No sessions found at {SESSIONS_PATH}")
         sys.exit(1)
-    return sorted(SESSIONS_PATH.glob("*.jsonl"), key=lambda p: p.stat().st_mtime)
+    entries.sort()
+    return [Path(path) for _, path in entries]
+
+
+def load_entries(data: bytes) -> list:
+    """Decode every non-empty line of raw JSONL bytes, skipping malformed ones."""
+    lines = [line for line in data.splitlines() if line.strip()]
+    # Fast path: one comprehension with no per-line exception handling
+    try:
+        return [json_loads(line) for line in lines]
+    except ValueError:
+        pass
+    entries = []
+    for line in lines:
+        try:
+            entries.append(json_loads(line))
+        except ValueError:
+            continue
+    return entries
+
+
+# Entry-type markers as they appear in the raw JSONL (compact and spaced separators)
+_MESSAGE_MARKERS = (
+    b'"type":"user"', b'"type":"assistant"',
+    b'"type": "user"', b'"type": "assistant"',
+)
 
 
-def parse_session(jsonl_path: Path) -> dict:
-    """Parse a session JSONL into a structured transcript with metadata."""
+def has_message_entries(data: bytes) -> bool:
+    """Cheap raw-byte check for any user/assistant entry; stops at the first marker found."""
+    return any(marker in data for marker in _MESSAGE_MARKERS)
+
+
+def parse_session(jsonl_path: Path, data: bytes | None = None) -> dict:
+    """Parse a session JSONL (or its already-read bytes) into a structured transcript with metadata."""
+    if data is None:
+        data = jsonl_path.read_bytes()
     messages = []
     session_id = jsonl_path.stem
     start_time = None
@@ -61,53 +167,45 @@ def parse_session(jsonl_path: Path) -> dict:
     git_branch = None
     cwd = None
     claude_version = None
+    metadata_remaining = 3
 
-    with open(jsonl_path) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-
-            # Extract session metadata from first entries that have it
+    for entry in load_entries(data):
+        # Extract session metadata from first entries that have it; no probing once all are found
+        if metadata_remaining:
             if git_branch is None and entry.get("gitBranch"):
                 git_branch = entry["gitBranch"]
+                metadata_remaining -= 1
             if cwd is None and entry.get("cwd"):
                 cwd = entry["cwd"]
+                metadata_remaining -= 1
             if claude_version is None and entry.get("version"):
                 claude_version = entry["version"]
-
-            entry_type = entry.get("type")
-
-            if entry_type in ("user", "assistant"):
-                msg = entry.get("message", {})
-                role = msg.get("role", entry_type)
-                content = msg.get("content", "")
-
-                # Content can be a string or list of content blocks
-                if isinstance(content, list):
-                    text_parts = []
-                    for block in content:
-                        if isinstance(block, str):
-                            text_parts.append(block)
-                        elif isinstance(block, dict) and block.get("type") == "text":
-                            text_parts.append(block.get("text", ""))
-                    content = "\n".join(text_parts)
-
-                if content.strip():
-                    timestamp = entry.get("timestamp")
-                    messages.append({
-                        "role": role,
-                        "content": content.strip(),
-                        "timestamp": timestamp,
-                    })
-                    if timestamp:
-                        if start_time is None:
-                            start_time = timestamp
-                        end_time = timestamp
+                metadata_remaining -= 1
+
+        entry_type = entry.get("type")
+
+        if entry_type in ("user", "assistant"):
+            msg = entry.get("message", {})
+            role = msg.get("role", entry_type)
+            content = msg.get("content", "")
+
+            # Content can be a string or list of content blocks
+            # Decoded JSON only ever yields exact str/dict, so plain type checks suffice
+            if type(content) is list:
+                content = "\n".join([
+                    block if type(block) is str else block.get("text", "")
+                    for block in content
+                    if type(block) is str
+                    or (type(block) is dict and block.get("type") == "text")
+                ])
+
+            if content.strip():
+                timestamp = entry.get("timestamp")
+                messages.append(Msg(role, content.strip(), timestamp))
+                if timestamp:
+                    if start_time is None:
+                        start_time = timestamp
+                    end_time = timestamp
 
     machine = get_machine_metadata()
 
@@ -122,7 +220,7 @@ def parse_session(jsonl_path: Path) -> dict:
             "git_branch": git_branch,
             "project_dir": cwd,
             "claude_version": claude_version,
-            "uploaded_at": datetime.now(timezone.utc).isoformat(),
+            "uploaded_at": _utc_iso_now(),
         },
         "message_count": len(messages),
         "start_time": start_time,
@@ -133,65 +231,75 @@ def parse_session(jsonl_path: Path) -> dict:
 
 def format_transcript(session_data: dict) -> str:
     """Format session data as readable text with metadata header for RLM agents."""
-    meta = session_data["metadata"]
-    lines = []
-
-    # Structured metadata header — agents parse this to differentiate users/sessions
-    lines.append("=" * 72)
-    lines.append("SESSION METADATA")
-    lines.append("=" * 72)
-    lines.append(f"session_id:      {session_data['session_id']}")
-    lines.append(f"developer:       {meta['developer']}")
-    lines.append(f"email:           {meta['email']}")
-    lines.append(f"hostname:        {meta['hostname']}")
-    lines.append(f"platform:        {meta['platform']}")
-    lines.append(f"os_user:         {meta['os_user']}")
-    lines.append(f"git_branch:      {meta['git_branch']}")
-    lines.append(f"project_dir:     {meta['project_dir']}")
-    lines.append(f"claude_version:  {meta['claude_version']}")
-    lines.append(f"message_count:   {session_data['message_count']}")
-    lines.append(f"start_time:      {session_data['start_time']}")
-    lines.append(f"end_time:        {session_data['end_time']}")
-    lines.append(f"uploaded_at:     {meta['uploaded_at']}")
-    lines.append("=" * 72)
-    lines.append("")
-
-    for msg in session_data["messages"]:
-        role = msg["role"].upper()
-        ts = f" [{msg['timestamp']}]" if msg.get("timestamp") else ""
-        lines.append(f"[{role}]{ts}")
-        lines.append(msg["content"])
-        lines.append("")
-        lines.append("---")
-        lines.append("")
-
-    return "\n".join(lines)
-
-
-def upload_to_volume(session_id: str, transcript_text: str, session_data: dict):
-    """Upload transcript to Modal volume."""
-    vol = modal.Volume.from_name(VOLUME_NAME)
-
-    now = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    remote_dir = f"/sessions/{session_id}"
+    header = _HEADER_TMPL.format_map({**session_data["metadata"], **session_data})
 
-    # Upload the readable transcript
-    transcript_bytes = transcript_text.encode("utf-8")
-    # Upload the raw JSON for programmatic access
-    json_bytes = json.dumps(session_data, indent=2, ensure_ascii=False).encode("utf-8")
+    # One pre-formatted block per message, joined once in C
+    blocks = (
+        f"[{_ROLE_UPPER.get(msg.role) or msg.role.upper()}]{' [' + msg.timestamp + ']' if msg.timestamp else ''}\n"
+        f"{msg.content}\n\n---\n"
+        for msg in session_data["messages"]
+    )
+    return "\n".join([header, *blocks])
 
-    import io
-    with vol.batch_upload(force=True) as batch:
-        batch.put_file(io.BytesIO(transcript_bytes), f"{remote_dir}/transcript.txt")
-        batch.put_file(io.BytesIO(json_bytes), f"{remote_dir}/session.json")
+
+def prepare_uploads(session_id: str, transcript_bytes: bytes, json_bytes: bytes) -> list[tuple[bytes, str]]:
+    """Build one session's files for the volume as (data, remote path) pairs."""
+    now = time.strftime("%Y%m%d_%H%M%S", time.gmtime())
+    remote_dir = f"/sessions/{session_id}"
+
+    return [
+        # The readable transcript
+        (transcript_bytes, f"{remote_dir}/transcript.txt"),
+        # The raw JSON for programmatic access
+        (json_bytes, f"{remote_dir}/session.json"),
         # Also keep a timestamped copy
-        batch.put_file(io.BytesIO(transcript_bytes), f"{remote_dir}/transcript_{now}.txt")
+        (transcript_bytes, f"{remote_dir}/transcript_{now}.txt"),
+    ]
+
+
+def prepare_session(jsonl_path: Path):
+    """Parse and encode one session as (session_id, transcript, session.json, message count), or None if empty."""
+    # One read serves both the marker check and the parse; sessions with no
+    # user/assistant entries at all are skipped before any decoding
+    data = jsonl_path.read_bytes()
+    if not has_message_entries(data):
+        return None
+    session_data = parse_session(jsonl_path, data)
+    del data  # raw JSONL is not needed while encoding
+    if session_data["message_count"] == 0:
+        return None
+    # Encode both files right away so only their bytes, not the parsed messages,
+    # stay alive until the batch is sent
+    transcript_bytes = format_transcript(session_data).encode("utf-8")
+    # Messages go back to their documented dict shape for session.json
+    json_bytes = json_dumps_pretty({**session_data, "messages": [msg._asdict() for msg in session_data["messages"]]})
+    return jsonl_path.stem, transcript_bytes, json_bytes, session_data["message_count"]
+
+
+@functools.cache
+def _vol() -> modal.Volume:
+    """Handle to the context volume (looked up once per process)."""
+    return modal.Volume.from_name(VOLUME_NAME)
+
+
+def upload_to_volume(sessions: list[tuple[str, bytes, bytes, int]]):
+    """Upload (session_id, transcript, session.json, message count) tuples to the Modal volume in one batch."""
+    vol = _vol()
+
+    summaries = []
+    with vol.batch_upload(force=True) as batch:
+        for session_id, transcript_bytes, json_bytes, message_count in sessions:
+            uploads = prepare_uploads(session_id, transcript_bytes, json_bytes)
+            for data, remote_path in uploads:
+                batch.put_file(io.BytesIO(data), remote_path)
+            (_, transcript_path), (_, json_path), _ = uploads
+            summaries.append((transcript_path, len(transcript_bytes), json_path, message_count))
 
-    size_kb = len(transcript_bytes) / 1024
     print(f"Uploaded to Modal volume '{VOLUME_NAME}':")
-    print(f"  {remote_dir}/transcript.txt ({size_kb:.1f} KB)")
-    print(f"  {remote_dir}/session.json")
-    print(f"  {session_data['message_count']} messages")
+    for transcript_path, transcript_size, json_path, message_count in summaries:
+        print(f"  {transcript_path} ({transcript_size / 1024:.1f} KB)")
+        print(f"  {json_path}")
+        print(f"  {message_count} messages")
 
 
 def main():
@@ -216,16 +324,19 @@ def main():
         # Latest session (most recently modified)
         targets = [session_files[-1]]
 
-    for jsonl_path in targets:
-        print(f"\nProcessing: {jsonl_path.stem}")
-        session_data = parse_session(jsonl_path)
-
-        if session_data["message_count"] == 0:
-            print("  (empty session, skipping)")
-            continue
+    # Read, parse and format sessions on a thread pool, then send them all in a single batch upload
+    pending = []
+    with ThreadPoolExecutor(max_workers=min(8, len(targets))) as pool:
+        for jsonl_path, prepared in zip(targets, pool.map(prepare_session, targets)):
+            print(f"\nProcessing: {jsonl_path.stem}")
+            if prepared is None:
+                print("  (empty session, skipping)")
+                continue
+            pending.append(prepared)
 
-        transcript = format_transcript(session_data)
-        upload_to_volume(jsonl_path.stem, transcript, session_data)
+    if pending:
+        print()
+        upload_to_volume(pending)
 
     print("\nDone.")
 